@@ -1,10 +1,21 @@
+import io
+import os
 import sys
+import math
+import mmap
+import re
+import warnings
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import networkx as nx # We will draw a random “node and link” graph for brain network simulation.
 
+from numba import njit
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 """
@@ -23,13 +34,57 @@ PyQt5 Widget Descriptions
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton,
-    QLabel, QLineEdit, QFileDialog
+    QLabel, QLineEdit, QFileDialog, QCheckBox
 )
+from PyQt5.QtCore import pyqtSignal
 from mpl_toolkits.mplot3d import Axes3D  # Required for 3D plots
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+# Mean, M2 (sum of squared differences from the mean, std = sqrt(M2 / n)), min and max of the EEG values in a single pass.
+# The loop is compiled by Numba (the signature makes it compile when the module is imported, not on the first click).
+# Mean and M2 are updated with Welford's method in float64, so the standard deviation does not lose precision.
+# The input is only about 100 values, so the loop runs on one thread: starting Numba's thread pool would cost more
+# than it saves (and a running pool makes starting ffmpeg for the export from the worker thread unsafe).
+@njit('Tuple((f8, f8, f4, f4))(f4[::1])', cache=True)
+def _stats(eeg_values):
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    low = np.inf
+    high = -np.inf
+    for i in range(eeg_values.shape[0]):
+        v = np.float64(eeg_values[i])
+        count += 1
+        delta = v - mean
+        mean += delta / count
+        m2 += delta * (v - mean)
+        if v < low: # NaN never compares true, so min and max skip NaN values (like np.nanmin/np.nanmax).
+            low = v
+        if v > high:
+            high = v
+    return mean, m2, np.float32(low), np.float32(high)
+
+# Statistics as (count, mean, M2, min, max), M2 is the sum of squared differences from the mean (std = sqrt(M2 / count)).
+def eeg_stats(eeg_values):
+    # The compiled signature only accepts writable contiguous float32 arrays (pandas may return a read-only view),
+    # np.require copies the input only when it is not like that already.
+    eeg_values = np.require(eeg_values, np.float32, ['C', 'W'])
+    mean, m2, low, high = _stats(eeg_values)
+    return eeg_values.size, mean, m2, float(low), float(high)
+
+# Combines the statistics of two parts of the input into the statistics of the whole input (Chan et al. / Welford update).
+# When values are appended, only the new part has to be read, the old values are never summed again.
+def combine_stats(a, b):
+    n_a, mean_a, m2_a, low_a, high_a = a
+    n_b, mean_b, m2_b, low_b, high_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2, min(low_a, low_b), max(high_a, high_b)
 
 # Simple mood prediction logic based on average EEG value
-def predict_mood(eeg_values):
-    avg = np.mean(eeg_values) 
+def classify_mood(avg):
     if avg > 2: # The threshold (min, max, mean values ​​are examined, classes are defined according to standard deviation.) value of 2 is a completely random value.
         return "Happy", "Brain activity shows high energy, suggesting a happy mood."
     elif avg < -2:
@@ -37,39 +92,207 @@ def predict_mood(eeg_values):
     else:
         return "Neutral", "Balanced activity, likely a neutral mood."
 
+def predict_mood(eeg_values):
+    return classify_mood(eeg_stats(eeg_values)[1])
+
+# Parses the comma separated text directly into a float32 array (without creating a Python float for every value).
+# EEG amplitudes only have a few meaningful digits, so float32 is enough everywhere in the app.
+def parse_eeg_text(text):
+    if not text.strip():
+        raise ValueError("No EEG values were entered.")
+    # NumPy reads an empty field ("1, , 2" or a trailing comma) as -1 without any warning, so those are rejected first.
+    if re.search(r'(^|,)\s*(,|$)', text):
+        raise ValueError("EEG input contains an empty value.")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning) # NumPy only warns when it meets a value it cannot read, we want it as an error.
+        try:
+            eeg_values = np.fromstring(text, sep=',', dtype=np.float32)
+        except DeprecationWarning:
+            raise ValueError("EEG input contains values that are not numbers.")
+    if eeg_values.size == 0:
+        raise ValueError("No EEG values were entered.")
+    return eeg_values
+
+# If new_text is old_text with more values added at the end (e.g. streamed samples), returns only the added part.
+# Otherwise (the text was changed somewhere else) it returns None and the whole text has to be parsed again.
+def appended_text(old_text, new_text):
+    if not old_text or not new_text.startswith(old_text):
+        return None
+    tail = new_text[len(old_text):].lstrip()
+    if not tail.startswith(','):
+        return None # "1.2" → "1.25" changes the last value instead of adding a new one.
+    return tail[1:]
+
+# Only the first lines of the CSV file are read through a memory map, a large file is never loaded completely
+# (the header and enough rows for 100 values are all we need, however wide the rows are).
+# Blank lines are not counted, pandas skips them too, so nrows rows are really in the returned text.
+def read_csv_head(file_path, lines):
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return "" # An empty file cannot be mapped, pandas reports it as an empty CSV.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = 0
+            while lines > 0 and end < len(mm):
+                start = end
+                end = mm.find(b'\n', start) + 1
+                if end == 0: # The last line has no line break, so the rest of the file is used.
+                    end = len(mm)
+                if mm[start:end].strip():
+                    lines -= 1
+            return mm[:end].decode('utf-8-sig')
+
 """ 
     3D Brain Network Plotting (randomized for visualization)
     It creates a “brain network simulation” 
     from randomly generated nodes and connections. We redraw this network after each EEG prediction, adding visuality and meaning.
 """
 
-def plot_3d_network(ax):
+def plot_3d_network(ax, pos):
     
     """ 
-        This means “probability of connection”.
-        0.3 → So there is a 30% chance of a line between every two nodes.
-    This way:
-    Not everyone is connected → realistic
-    But there is no connection either → visually meaningful
+        pos: (10, 3) array with the x, y, z position of every node.
+    The nodes, their labels and the edges are created only once (when the window opens).
+    All edges are a single Line3DCollection, its segments are set when a new network is generated.
+    Every prediction and every animation frame later moves these artists instead of creating new ones.
 
 """
-    G = nx.erdos_renyi_graph(10, 0.3) #The graphic object (network) we created + 10 nodes are ideal for giving the impression of a neuronal network.
-    pos = {i: np.random.rand(3) for i in G.nodes}
-
-    ax.scatter(*zip(*pos.values()), s=200, c='skyblue', alpha=0.6) # Converts the list [ [x,y,z], [x,y,z], ... ] into separate lists x, y, z.
+    scat = ax.scatter(pos[:, 0], pos[:, 1], pos[:, 2], s=200, c='skyblue', alpha=0.6) # The columns of pos are the x, y, z values (views, nothing is copied).
 
-    for (i, j) in G.edges:
-        ax.plot([pos[i][0], pos[j][0]], [pos[i][1], pos[j][1]], [pos[i][2], pos[j][2]], 'k-', alpha=0.6)
+    # The collection starts with one zero-length segment at the first node: an empty collection cannot be added
+    # to a 3D axes in newer matplotlib versions. The real edges replace it as soon as a network is generated.
+    edge_lines = Line3DCollection(pos[[[0, 0]]], colors='k', alpha=0.6)
+    ax.add_collection3d(edge_lines)
 
-    for i, (x, y, z) in pos.items():
-        ax.text(x, y, z, f"Node {i}", fontsize=10, ha='center')
+    labels = [ax.text(x, y, z, f"N{i}", fontsize=10, ha='center') for i, (x, y, z) in enumerate(pos)]
 
     ax.set_title("3D Brain Network")
     ax.set_xlabel("X")
     ax.set_ylabel("Y")
     ax.set_zlabel("Z")
-    
+
+    return scat, edge_lines, labels
+
+def plot_2d_network(ax, pos):
+
+    """ 
+        pos: (10, 2) array with the x, y position of every node (spring layout).
+    Same artists as plot_3d_network, but on a flat axes: nothing has to be projected when a frame is drawn,
+    which makes this view much cheaper to animate. It is the default, the 3D view is behind a checkbox.
+
+"""
+    scat = ax.scatter(pos[:, 0], pos[:, 1], s=200, c='skyblue', alpha=0.6)
+
+    edge_lines = LineCollection(np.empty((0, 2, 2)), colors='k', alpha=0.6)
+    ax.add_collection(edge_lines)
+
+    labels = [ax.text(x, y, f"N{i}", fontsize=10, ha='center') for i, (x, y) in enumerate(pos)]
+
+    ax.set_xlim(-1.2, 1.2) # spring_layout places the nodes inside [-1, 1].
+    ax.set_ylim(-1.2, 1.2)
+    ax.set_title("Brain Network")
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+
+    return scat, edge_lines, labels
+
+def setup_figure(fig):
+    """
+    drawing area (ax1): EEG signal (2D drawing) 
+    The area and the line are created here only once, a prediction just updates their data.
+    """
+    ax1 = fig.add_subplot(121)
+
+    line1, = ax1.plot([], [], label="EEG Data", color='b')
+    ax1.set_title("Brain Activity (EEG)")
+    ax1.set_xlabel("Time")
+    ax1.set_ylabel("Amplitude")
+    ax1.legend(handles=[line1]) # Built once with the line as its only entry, frames never touch the legend.
+
+    return ax1, line1
+
+# Y limits of the EEG plot from the min and max in eeg_stats (NaN samples are already skipped there), so the values
+# are not scanned again. If no value is a finite number (all NaN or inf) the default limits are used,
+# because set_ylim raises on NaN or infinite limits.
+def eeg_ylim(low, high):
+    if not (math.isfinite(low) and math.isfinite(high)):
+        return -1.0, 1.0
+    return low, high
+
+def add_network(fig, pos):
+    """
+    drawing area (ax2): Brain network
+    (10, 2) positions give the flat spring layout view, (10, 3) positions give the 3D view.
     """
+    if pos.shape[1] == 3:
+        ax2 = fig.add_subplot(122, projection='3d')
+        return (ax2, *plot_3d_network(ax2, pos))
+    ax2 = fig.add_subplot(122)
+    return (ax2, *plot_2d_network(ax2, pos))
+
+# Moves the nodes a little (giving a dynamic appearance) without rebuilding the network.
+# Every frame jitters around the generated base positions, so the nodes never drift out of view.
+# In the 3D view every label has to be projected and rendered again in each frame (the most expensive part),
+# so there the labels are hidden during the first pass of the animation and only shown from its last frame on.
+def move_network(rng, base_pos, edges, scat, edge_lines, labels, show_labels=False):
+    pos = base_pos + 0.01 * rng.standard_normal(base_pos.shape, dtype=np.float32)
+    edge_lines.set_segments(pos[edges]) # (number of edges, 2, 2 or 3): start and end point of every edge.
+    if pos.shape[1] == 2:
+        scat.set_offsets(pos)
+        for label, p in zip(labels, pos):
+            label.set_position(p)
+        return
+    xs, ys, zs = pos[:, 0], pos[:, 1], pos[:, 2]
+    scat._offsets3d = (xs, ys, zs)
+    # Blitting does not redraw the 3D axes, so the collections are projected here.
+    scat.do_3d_projection()
+    edge_lines.do_3d_projection()
+    for label, p in zip(labels, pos):
+        label.set_visible(show_labels)
+        if show_labels:
+            label.set_position_3d(p)
+
+"""
+    Saving the animation takes a few seconds, so it runs in a worker thread.
+    The worker draws on its own figure (not the one inside the Qt window), so the GUI stays responsive.
+    It also uses its own random generator, a Generator must not be shared between threads.
+    Every frame is drawn directly and handed to the writer: .mp4 is written with imageio (much faster and smaller),
+    .gif is still possible with matplotlib's PillowWriter.
+"""
+
+def save_animation(eeg_values, ylim, pos, edges, file_path="eeg_network_animation.mp4"):
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax1, line1 = setup_figure(fig)
+    ax2, scat, edge_lines, labels = add_network(fig, pos)
+    ax1.set_xlim(0, len(eeg_values))
+    ax1.set_ylim(*ylim)
+    canvas.draw() # The 3D projection needs one full draw before the first frame.
+
+    time = np.arange(len(eeg_values), dtype=np.float32) # Sample indices, every frame only takes a slice (a view) of it.
+    rng = np.random.default_rng()
+
+    def frames():
+        for frame in range(1, len(eeg_values) + 1):
+            line1.set_data(time[:frame], eeg_values[:frame])
+            move_network(rng, pos, edges, scat, edge_lines, labels, show_labels=frame == len(eeg_values))
+            yield
+
+    if file_path.endswith(".gif"):
+        writer = PillowWriter(fps=10) # PillowWriter is used to save the animation as .gif.
+        with writer.saving(fig, file_path, fig.dpi):
+            for _ in frames():
+                writer.grab_frame()
+    else:
+        # Imported only here, so the app also runs without imageio: a missing package just makes the .mp4 export fail
+        # (the error is shown in the window by on_export_done).
+        import imageio # Writes the exported animation as .mp4 (needs the imageio-ffmpeg package).
+        with imageio.get_writer(file_path, fps=10) as writer:
+            for _ in frames():
+                canvas.draw()
+                writer.append_data(np.asarray(canvas.buffer_rgba())) # The RGBA pixels of the drawn frame, without a copy.
+    return file_path
+
+"""
         This __init__ function creates the entire interface. 
         All buttons, input fields and the drawing area are initialized and positioned here
         - load_csv_file (file upload)
@@ -79,9 +302,12 @@ def plot_3d_network(ax):
         + self refers to itself within the class so when you create an EEGApp object, self is that object itself.
             1. To define data (variables) belonging to the class
             2. To access from other functions 
-    """
+"""
 
 class EEGApp(QWidget): # Because it derives from QWidget, this class behaves like a window.
+    # Emitted from the export worker thread, Qt delivers it to the GUI thread where the label can be changed safely.
+    export_finished = pyqtSignal(str)
+
     def __init__(self): # a constructor method.
         super().__init__() # It calls the functions of the superclass QWidget.
         self.setWindowTitle("EEG Mood Classifier with Animation")
@@ -91,6 +317,14 @@ class EEGApp(QWidget): # Because it derives from QWidget, this class behaves lik
 
         self.eeg_input = QLineEdit()
         self.eeg_input.setPlaceholderText("Enter EEG data separated by commas: 1.2, 2.3, ...")
+        self.eeg_input.textEdited.connect(self.on_text_edited) # textEdited is only emitted when the user types, not for setText.
+        # Parsed values of the input box (or of the last CSV file, the box then only shows a short preview of them).
+        # They are parsed again only after the user edits the text, and only the new part if values were appended.
+        self._parsed = None
+        self._buffer = None # _parsed is the start of this array, the rest is room for appended values.
+        self._parsed_text = "" # The text the parsed values belong to.
+        self._parsed_stats = None # eeg_stats of the parsed values, kept up to date when values are appended.
+        self._text_changed = False
         layout.addWidget(self.eeg_input)
 
         self.example_label = QLabel("Example: 1.2, 2.3, 0.5, 3.2")
@@ -104,15 +338,42 @@ class EEGApp(QWidget): # Because it derives from QWidget, this class behaves lik
         self.button.clicked.connect(self.on_button_click)
         layout.addWidget(self.button)
 
+        self.export_button = QPushButton("Export Animation")
+        self.export_button.clicked.connect(self.on_export_click)
+        layout.addWidget(self.export_button)
+
+        self.export_gif_checkbox = QCheckBox("Export as GIF instead of MP4 (slower)")
+        layout.addWidget(self.export_gif_checkbox)
+
         self.result_label = QLabel("Mood: ")
         layout.addWidget(self.result_label)
 
         self.network_info_label = QLabel("Brain Network Info: ")
         layout.addWidget(self.network_info_label)
 
+        self.network_3d_checkbox = QCheckBox("3D brain network (slower)")
+        self.network_3d_checkbox.toggled.connect(self.on_network_mode_changed)
+        layout.addWidget(self.network_3d_checkbox)
+
         self.canvas = FigureCanvas(plt.figure()) # FigureCanvas: places the graphic in the Qt interface.
         layout.addWidget(self.canvas)
 
+        # One random generator for the whole window, every draw returns a full (10, 3) array in one call.
+        self._rng = np.random.default_rng(0)
+        self.pos = self._rng.random((10, 3), dtype=np.float32)
+        self.pos2d = self._rng.random((10, 2), dtype=np.float32) * 2 - 1
+        self.ax1, self.line1 = setup_figure(self.canvas.figure)
+
+        # Both network views are created once, the checkbox only decides which one is visible.
+        self.network_2d = add_network(self.canvas.figure, self.pos2d)
+        self.network_3d = add_network(self.canvas.figure, self.pos)
+        self.network_3d[0].set_visible(False)
+        self.ani = None
+        self._last_eeg_values = None # Values of the last prediction, used by "Export Animation".
+        self._last_ylim = None # and their y limits.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.export_finished.connect(self.network_info_label.setText)
+
         self.setLayout(layout)
 
     def load_csv_file(self):
@@ -120,78 +381,166 @@ class EEGApp(QWidget): # Because it derives from QWidget, this class behaves lik
         file_path, _ = QFileDialog.getOpenFileName(self, "Open EEG CSV", "", "CSV Files (*.csv)") 
         if file_path:
             try:
-                df = pd.read_csv(file_path)
-                if "label" in df.columns:
-                    df = df.drop("label", axis=1)
-                values = df.values.flatten()[:100]
-                self.eeg_input.setText(', '.join(map(str, values)))
+                # Only the header is read first, so we know how many rows are needed for 100 values.
+                header = pd.read_csv(io.StringIO(read_csv_head(file_path, 1)), nrows=0)
+                columns = [c for c in header.columns if c != "label"]
+                if not columns:
+                    raise ValueError("CSV file has no EEG columns.")
+                nrows = math.ceil(100 / len(columns))
+                head = io.StringIO(read_csv_head(file_path, 1 + nrows))
+                df = pd.read_csv(head, usecols=columns, nrows=nrows, dtype=np.float32)
+                values = df.to_numpy(copy=False).ravel()[:100]
+                if values.size == 0:
+                    raise ValueError("CSV file has no EEG values.")
+                stats = eeg_stats(values) # Computed before anything is changed, so a failure leaves the previous input intact.
+                preview = ', '.join(f'{v:.3g}' for v in values[:8])
+                self.eeg_input.setText(preview + ', …' if len(values) > 8 else preview)
+                self._parsed = self._buffer = values
+                self._parsed_text = self.eeg_input.text()
+                self._parsed_stats = stats
+                self._text_changed = False
             except Exception as e:
                 self.result_label.setText("Could not read CSV file.")
                 self.network_info_label.setText(str(e))
 
+    def on_text_edited(self):
+        # The user changed the input, so the parsed values are no longer what the box shows.
+        self._text_changed = True
+
+    def parse_input(self):
+        text = self.eeg_input.text()
+        tail = appended_text(self._parsed_text, text) if self._parsed is not None else None
+        if tail is not None:
+            new_values = parse_eeg_text(tail)
+            self._parsed_stats = combine_stats(self._parsed_stats, eeg_stats(new_values))
+            self.append_parsed(new_values)
+        else:
+            self._parsed = self._buffer = parse_eeg_text(text)
+            self._parsed_stats = eeg_stats(self._parsed)
+        self._parsed_text = text
+        self._text_changed = False
+
+    def append_parsed(self, new_values):
+        # The buffer doubles when it is full, so appending only copies the new values
+        # (the old ones are copied again only when the buffer grows, not on every click).
+        # A slice that was handed out before (e.g. to the running animation) never changes: new values go after its end.
+        n = self._parsed.size
+        end = n + new_values.size
+        if end > self._buffer.size:
+            buffer = np.empty(max(2 * self._buffer.size, end), dtype=np.float32)
+            buffer[:n] = self._parsed
+            self._buffer = buffer
+        self._buffer[n:end] = new_values
+        self._parsed = self._buffer[:end]
+
     def on_button_click(self):
         try:
-            eeg_values = np.array([float(x) for x in self.eeg_input.text().split(',')])
-            mood, info = predict_mood(eeg_values)
+            if self._parsed is None or self._text_changed:
+                self.parse_input()
+            eeg_values = self._parsed
+            mood, info = classify_mood(self._parsed_stats[1]) # [1] is the mean.
             self.result_label.setText(f"Mood: {mood}")
             self.network_info_label.setText(info)
-            self.create_animation(eeg_values)
-        except:
+            self.create_animation(eeg_values, self._parsed_stats[3:5]) # [3:5] are the min and max.
+        except ValueError:
             self.result_label.setText("Invalid EEG input.")
             self.network_info_label.setText("Animation failed.")
 
-    def create_animation(self, eeg_values):
-        self.canvas.figure.clf()
-        
+    def create_animation(self, eeg_values, value_range):
+        # The line is empty at first and filled frame by frame, so the axis limits are set here once.
+        # value_range is the (min, max) from the statistics of the prediction, the values are not scanned again.
+        ylim = eeg_ylim(*value_range)
+        self.line1.set_data([], [])
+        self.ax1.set_xlim(0, len(eeg_values))
+        self.ax1.set_ylim(*ylim)
+
+        """ 
+            This means “probability of connection”.
+            0.3 → So there is a 30% chance of a line between every two nodes.
+        This way:
+        Not everyone is connected → realistic
+        But there is no connection either → visually meaningful
+        The network is generated only once here and reused in every frame of the animation.
+        The 3D view uses random positions, the 2D view uses a spring layout of the same network.
         """
-        drawing area (ax1): EEG signal (2D drawing) 
-        drawing area (ax2): Brain network (3D)
-        We draw the EEG signal to ax1, The title and axis names are set.
-        """
-        
-        ax1 = self.canvas.figure.add_subplot(121)
-        ax2 = self.canvas.figure.add_subplot(122, projection='3d')
-
-        time = np.linspace(0, len(eeg_values), len(eeg_values))
-        ax1.plot(time, eeg_values, label="EEG Data", color='b')
-        ax1.set_title("Brain Activity (EEG)")
-        ax1.set_xlabel("Time")
-        ax1.set_ylabel("Amplitude")
-        ax1.legend()
-
-        plot_3d_network(ax2)
-        self.animate(ax1, ax2, eeg_values)
-
-        self.canvas.draw()
-
-    def animate(self, ax1, ax2, eeg_values):
+        self.G = nx.erdos_renyi_graph(10, 0.3) #The graphic object (network) we created + 10 nodes are ideal for giving the impression of a neuronal network.
+        self.pos = self._rng.random((10, 3), dtype=np.float32)
+        layout = nx.spring_layout(self.G, seed=0)
+        self.pos2d = np.array([layout[i] for i in self.G.nodes], dtype=np.float32)
+        self.edges = np.asarray(list(self.G.edges), dtype=np.int32).reshape(-1, 2)
+
+        self._last_eeg_values = eeg_values
+        self._last_ylim = ylim
+        self.animate(eeg_values)
+
+        self.canvas.draw_idle()
+
+    def current_network(self):
+        # Positions and artists (ax2, scat, edge_lines, labels) of the network view that is shown.
+        if self.network_3d_checkbox.isChecked():
+            return self.pos, self.network_3d
+        return self.pos2d, self.network_2d
+
+    def on_network_mode_changed(self, use_3d):
+        self.network_2d[0].set_visible(not use_3d)
+        self.network_3d[0].set_visible(use_3d)
+        if self._last_eeg_values is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.draw() # The 3D projection needs one full draw of the visible axes before the first frame.
+        self.animate(self._last_eeg_values)
+        self.canvas.draw_idle()
+
+    def stop_animation(self):
+        # The previous animation must not keep drawing on the same figure. Stopping its timer is not enough:
+        # matplotlib starts it again after a window resize, so its canvas callbacks are disconnected as well.
+        if self.ani is None:
+            return
+        if self.ani.event_source is not None:
+            self.ani.event_source.stop()
+        for cid in (getattr(self.ani, '_first_draw_id', None), getattr(self.ani, '_resize_id', None), getattr(self.ani, '_close_id', None)):
+            if cid is not None:
+                self.canvas.mpl_disconnect(cid)
+        self.ani = None
+
+    def animate(self, eeg_values):
+        self.stop_animation()
+
+        pos, (ax2, scat, edge_lines, labels) = self.current_network()
+        edges = self.edges
+        time = np.arange(len(eeg_values), dtype=np.float32) # Sample indices, every frame only takes a slice (a view) of it.
+
+        first_pass_done = False # The animation repeats, the 3D labels stay visible once it has played through once.
+
+        # Only the data of the existing artists changes in each frame, so blit=True redraws just these artists.
+        # Everything the frames use is captured here, so this animation never mixes its data with a later prediction.
         def update(frame):
-            ax1.clear()
-            ax1.plot(np.linspace(0, frame, frame), eeg_values[:frame], label="EEG Data", color='b')
-            ax1.set_title("Brain Activity (EEG)")
-            ax1.set_xlabel("Time")
-            ax1.set_ylabel("Amplitude")
-            ax1.legend()
-
-            G = nx.erdos_renyi_graph(10, 0.3) #The brain network is redrawn in each frame (giving a dynamic appearance).
-            pos = {i: np.random.rand(3) for i in G.nodes}
-            ax2.clear()
-            ax2.scatter(*zip(*pos.values()), s=200, c='skyblue', alpha=0.6)
-            for (i, j) in G.edges:
-                ax2.plot([pos[i][0], pos[j][0]], [pos[i][1], pos[j][1]], [pos[i][2], pos[j][2]], 'k-', alpha=0.6)
-            for i, (x, y, z) in pos.items():
-                ax2.text(x, y, z, f"N{i}", fontsize=10, ha='center')
-            ax2.set_title("Brain Network")
-            ax2.set_xlabel("X")
-            ax2.set_ylabel("Y")
-            ax2.set_zlabel("Z")
-
-        ani = FuncAnimation(self.canvas.figure, update, frames=np.arange(1, len(eeg_values)+1), interval=100)
+            nonlocal first_pass_done
+            first_pass_done = first_pass_done or frame == len(eeg_values)
+            self.line1.set_data(time[:frame], eeg_values[:frame])
+            move_network(self._rng, pos, edges, scat, edge_lines, labels, show_labels=first_pass_done)
+            return (self.line1, scat, edge_lines, *labels)
+
+        # The animation is kept on self, otherwise it would be garbage collected and stop immediately.
+        self.ani = FuncAnimation(self.canvas.figure, update, frames=np.arange(1, len(eeg_values)+1), interval=100, blit=True)
+
+    def on_export_click(self):
+        if self._last_eeg_values is None:
+            self.network_info_label.setText("Predict a mood first, then export the animation.")
+            return
+        # The base positions are never changed by the animation, so the worker can share them with the window.
+        pos, _ = self.current_network()
+        file_path = "eeg_network_animation.gif" if self.export_gif_checkbox.isChecked() else "eeg_network_animation.mp4"
+        future = self._executor.submit(save_animation, self._last_eeg_values, self._last_ylim, pos, self.edges, file_path)
+        future.add_done_callback(self.on_export_done)
+        self.network_info_label.setText(f"Saving animation as {file_path}...")
+
+    def on_export_done(self, future):
+        # This runs in the worker thread, so the message goes through the export_finished signal.
         try:
-            ani.save("eeg_network_animation.gif", writer=PillowWriter(fps=10)) # PillowWriter is used to save the animation as .gif.
-            print("Animation saved as GIF.")
+            self.export_finished.emit(f"Animation saved as {future.result()}")
         except Exception as e:
-            print("Could not save animation:", e)
+            self.export_finished.emit(f"Could not save animation: {e}")
 
             """
                 QApplication → is the heart of the PyQt application.